@@ -41,7 +41,7 @@ class OnlineCallback(Callback):
         Send the current data to the plotter
     """
 
-    def __init__(self, ocp, opts: dict = None, show_options: dict = None):
+    def __init__(self, ocp, opts: dict = None, show_options: dict = None, ng: int = 0):
         """
         Parameters
         ----------
@@ -51,6 +51,9 @@ class OnlineCallback(Callback):
             Option to AnimateCallback method of CasADi
         show_options: dict
             The options to pass to PlotOcp
+        ng: int
+            The number of constraints of the program. Declaring the true dimension lets CasADi build the callback
+            with the actual sparsity of g and lam_g instead of empty placeholders
         """
         if opts is None:
             opts = {}
@@ -58,7 +61,7 @@ class OnlineCallback(Callback):
         Callback.__init__(self)
         self.ocp = ocp
         self.nx = self.ocp.variables_vector.shape[0]
-        self.ng = 0
+        self.ng = ng
         self.construct("AnimateCallback", opts)
 
         self.queue = mp.Queue()
@@ -13,7 +13,7 @@ from ..misc.enums import InterpolationType
 from ..optimization.non_linear_program import NonLinearProgram
 
 
-def generic_online_optim(interface, ocp, show_options: dict = None):
+def generic_online_optim(interface, ocp, show_options: dict = None, ng: int = 0):
     """
     Declare the online callback to update the graphs while optimizing
 
@@ -23,11 +23,13 @@ def generic_online_optim(interface, ocp, show_options: dict = None):
         A reference to the current OptimalControlProgram
     show_options: dict
         The options to pass to PlotOcp
+    ng: int
+        The number of constraints of the program, so the callback reports the true sparsity of g and lam_g
     """
 
     if platform != "linux":
         raise RuntimeError("Online graphics are only available on Linux")
-    interface.options_common["iteration_callback"] = OnlineCallback(ocp, show_options=show_options)
+    interface.options_common["iteration_callback"] = OnlineCallback(ocp, show_options=show_options, ng=ng)
 
 
 def generic_solve(interface, expand_during_shake_tree=False) -> dict:
@@ -56,7 +58,8 @@ def generic_solve(interface, expand_during_shake_tree=False) -> dict:
     all_g = _shake_tree_for_penalties(interface.ocp, all_g, v, v_bounds, expand_during_shake_tree)
 
     if interface.opts.show_online_optim:
-        interface.online_optim(interface.ocp, interface.opts.show_options)
+        # The callback is declared once the constraints are dispatched, so it knows the true dimension of g
+        interface.online_optim(interface.ocp, interface.opts.show_options, ng=all_g.shape[0])
 
     # Thread here on (f and all_g) instead of individually for each function?
     interface.sqp_nlp = {"x": v, "f": sum1(all_objectives), "g": all_g}
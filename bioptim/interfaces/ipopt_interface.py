@@ -72,7 +72,7 @@ class IpoptInterface(SolverInterface):
         self.lam_g = None
         self.lam_x = None
 
-    def online_optim(self, ocp, show_options: dict = None):
+    def online_optim(self, ocp, show_options: dict = None, ng: int = 0):
         """
         Declare the online callback to update the graphs while optimizing
 
@@ -82,9 +82,11 @@ class IpoptInterface(SolverInterface):
             A reference to the current OptimalControlProgram
         show_options: dict
             The options to pass to PlotOcp
+        ng: int
+            The number of constraints of the program
         """
 
-        generic_online_optim(self, ocp, show_options)
+        generic_online_optim(self, ocp, show_options, ng)
 
     def solve(self, expand_during_shake_tree) -> dict:
         """
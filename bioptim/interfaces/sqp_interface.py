@@ -71,7 +71,7 @@ class SQPInterface(SolverInterface):
         self.lam_g = None
         self.lam_x = None
 
-    def online_optim(self, ocp, show_options: dict = None):
+    def online_optim(self, ocp, show_options: dict = None, ng: int = 0):
         """
         Declare the online callback to update the graphs while optimizing
 
@@ -81,8 +81,10 @@ class SQPInterface(SolverInterface):
             A reference to the current OptimalControlProgram
         show_options: dict
             The options to pass to PlotOcp
+        ng: int
+            The number of constraints of the program
         """
-        generic_online_optim(self, ocp, show_options)
+        generic_online_optim(self, ocp, show_options, ng)
 
     def solve(self, expand_during_shake_tree) -> dict:
         """
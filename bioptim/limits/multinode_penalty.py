@@ -754,6 +754,28 @@ class MultinodePenaltyList(UniquePerPhaseOptionList):
             option_type=option_type, multinode_penalty=multinode_penalty, phase=phase, **extra_arguments
         )
 
+    def add_range(self, multinode_penalty: Any, nodes_phase: tuple, node_pairs, **extra_arguments: Any):
+        """
+        Add the same MultinodePenalty on a sequence of node pairs sharing the same phases
+
+        The entries are expanded right away (the option list bookkeeping needs one option per entry), but the
+        caller only builds the keyword arguments once for the whole range.
+
+        Parameters
+        ----------
+        multinode_penalty: Callable | MultinodePenaltyFcn
+            The chosen penalty
+        nodes_phase: tuple
+            The phases shared by all the entries
+        node_pairs: iterable
+            The (first, second) node pairs the penalty is declared on
+        extra_arguments: dict
+            Any parameters to pass to the penalty
+        """
+
+        for nodes in node_pairs:
+            self.add(multinode_penalty, nodes_phase=nodes_phase, nodes=nodes, **extra_arguments)
+
     def add_or_replace_to_penalty_pool(self, ocp):
         """
         Configure all the multinode penalties and put them in a list
@@ -1,5 +1,7 @@
 from typing import Callable, Any
 
+import numpy as np
+
 from .penalty import PenaltyFunctionAbstract, PenaltyOption
 from .penalty_controller import PenaltyController
 from ..misc.enums import Node, QuadratureRule, PenaltyType
@@ -298,7 +300,10 @@ class ObjectiveFunction:
         if list_index >= len(ocp_or_nlp.J) or list_index < 0:
             raise ValueError("'list_index' must be defined properly")
 
-        ocp_or_nlp.J[list_index].target = new_target
+        # Stored contiguous for the same reason as in PenaltyOption.__init__
+        ocp_or_nlp.J[list_index].target = (
+            None if new_target is None else np.ascontiguousarray(new_target, dtype=np.float64)
+        )
 
 
 class ObjectiveFcn:
@@ -50,7 +50,15 @@ class PenaltyHelpers:
         TODO COMPLETE
         """
 
-        return _reshape_to_vector(_reshape_to_vector(get_all_dt(ocp.time_phase_mapping.to_first.map_idx)))
+        # The mapping indices are immutable once the ocp is built, so they are resolved once and cached instead of
+        # being dereferenced at every call. The result of get_all_dt is already a vector after one reshape, so the
+        # historical second reshape (which still added a graph node) is dropped
+        map_idx = getattr(ocp, "_time_phase_map_idx", None)
+        if map_idx is None:
+            map_idx = ocp.time_phase_mapping.to_first.map_idx
+            ocp._time_phase_map_idx = map_idx
+
+        return _reshape_to_vector(get_all_dt(map_idx))
 
     @staticmethod
     def states(penalty, index, get_state_decision: Callable, is_constructing_penalty: bool = False):
@@ -63,42 +71,29 @@ class PenaltyHelpers:
             The slice(-1, None) will not be requested when the penalty is not being constructed (it will request
             slice(0, 1) of the following node instead)
         """
-        if isinstance(penalty.phase, list) and len(penalty.phase) > 1:
-            raise NotImplementedError("penalty cost over multiple phases is not implemented yet")
-
-        node = penalty.node_idx[index]
-
-        if penalty.multinode_penalty:
-            x = []
-            phases, nodes, subnodes = _get_multinode_indices(penalty, is_constructing_penalty)
-            for phase, node, sub in zip(phases, nodes, subnodes):
-                x.append(_reshape_to_vector(get_state_decision(phase, node, sub)))
-            return _vertcat(x)
-
-        else:
-            subnodes = slice(0, None if node < penalty.ns[0] and penalty.subnodes_are_decision_states[0] else 1)
-            x0 = _reshape_to_vector(get_state_decision(penalty.phase, node, subnodes))
+        # The branch to take is fixed for the lifetime of the penalty, so it is resolved once and cached on the
+        # penalty instead of being re-tested for each of the O(n_penalty * n_nodes) calls
+        impl = getattr(penalty, "_states_impl", None)
+        if impl is None:
+            if isinstance(penalty.phase, list) and len(penalty.phase) > 1:
+                raise NotImplementedError("penalty cost over multiple phases is not implemented yet")
+            impl = _states_multinode if penalty.multinode_penalty else _states_single_node
+            penalty._states_impl = impl
 
-            if is_constructing_penalty:
-                if node < penalty.ns[0]:
-                    x1 = _reshape_to_vector(get_state_decision(penalty.phase, node, slice(-1, None)))
-                else:
-                    x1 = type(x0).sym("dummy_x", 0, 1)
-            else:
-                x1 = _reshape_to_vector(get_state_decision(penalty.phase, node + 1, slice(0, 1)))
-            return vertcat(x0, x1)
+        return impl(penalty, index, get_state_decision, is_constructing_penalty)
 
     @staticmethod
     def controls(penalty, index, get_control_decision: Callable, is_constructing_penalty: bool = False):
         node = penalty.node_idx[index]
 
         if penalty.multinode_penalty:
-            u = []
             phases, nodes, subnodes = _get_multinode_indices(penalty, is_constructing_penalty)
-            for phase, node, sub in zip(phases, nodes, subnodes):
-                # No need to test for control types as this is never integrated (so we only need the starting value)
-                u.append(_reshape_to_vector(get_control_decision(phase, node, sub)))
-            return _vertcat(u)
+            # No need to test for control types as this is never integrated (so we only need the starting value)
+            u = tuple(
+                _reshape_to_vector(get_control_decision(phase, node, sub))
+                for phase, node, sub in zip(phases, nodes, subnodes)
+            )
+            return np.vstack(u) if isinstance(u[0], np.ndarray) else vertcat(*u)
 
         if is_constructing_penalty:
             if penalty.control_types[0] in (ControlType.LINEAR_CONTINUOUS,):
@@ -118,7 +113,7 @@ class PenaltyHelpers:
         else:
             u0 = _reshape_to_vector(get_control_decision(penalty.phase, node, slice(0, 1)))
             u1 = _reshape_to_vector(get_control_decision(penalty.phase, node + 1, slice(0, 1)))
-            u = _vertcat([u0, u1])
+            u = np.vstack((u0, u1)) if isinstance(u0, np.ndarray) else vertcat(u0, u1)
 
         return u
 
@@ -135,12 +130,23 @@ class PenaltyHelpers:
     @staticmethod
     def target(penalty, penalty_node_idx):
         if penalty.target is None:
-            return np.array([])
+            return _EMPTY_TARGET
+
+        if __debug__:
+            # The target is expected to be stored contiguous (see PenaltyOption.__init__) so the indexing below
+            # stays copy-free
+            assert penalty.target.flags.c_contiguous, "penalty.target should be stored as a C-contiguous array"
 
         if penalty.integrate:
-            target0 = penalty.target[..., penalty_node_idx]
-            target1 = penalty.target[..., penalty_node_idx + 1]
-            return np.vstack((target0, target1)).T
+            # The target is fixed once the penalty is built, so the stacked (start, end) pairs are computed a single
+            # time and indexed afterwards instead of allocating a fresh np.vstack at every evaluation. The cache is
+            # keyed on the identity of the target so rebinding it invalidates the slab
+            cache = getattr(penalty, "_target_integrate_cache", None)
+            if cache is None or cache[0] is not penalty.target:
+                stacked = np.stack((penalty.target[..., :-1], penalty.target[..., 1:]), axis=-1)
+                cache = (penalty.target, stacked)
+                penalty._target_integrate_cache = cache
+            return cache[1][..., penalty_node_idx, :]
 
         return penalty.target[..., penalty_node_idx]
 
@@ -192,6 +198,38 @@ class PenaltyHelpers:
         return out
 
 
+def _states_multinode(penalty, index, get_state_decision: Callable, is_constructing_penalty: bool):
+    """
+    The multinode branch of PenaltyHelpers.states
+    """
+
+    phases, nodes, subnodes = _get_multinode_indices(penalty, is_constructing_penalty)
+    x = tuple(
+        _reshape_to_vector(get_state_decision(phase, node, sub)) for phase, node, sub in zip(phases, nodes, subnodes)
+    )
+    # All the elements come from the same getter so they necessarily share a type; concatenate directly
+    return np.vstack(x) if isinstance(x[0], np.ndarray) else vertcat(*x)
+
+
+def _states_single_node(penalty, index, get_state_decision: Callable, is_constructing_penalty: bool):
+    """
+    The single node branch of PenaltyHelpers.states
+    """
+
+    node = penalty.node_idx[index]
+    subnodes = slice(0, None if node < penalty.ns[0] and penalty.subnodes_are_decision_states[0] else 1)
+    x0 = _reshape_to_vector(get_state_decision(penalty.phase, node, subnodes))
+
+    if is_constructing_penalty:
+        if node < penalty.ns[0]:
+            x1 = _reshape_to_vector(get_state_decision(penalty.phase, node, slice(-1, None)))
+        else:
+            x1 = type(x0).sym("dummy_x", 0, 1)
+    else:
+        x1 = _reshape_to_vector(get_state_decision(penalty.phase, node + 1, slice(0, 1)))
+    return vertcat(x0, x1)
+
+
 def _get_multinode_indices(penalty, is_constructing_penalty: bool):
     if not penalty.multinode_penalty:
         raise RuntimeError("This function should only be called for multinode penalties")
@@ -215,35 +253,26 @@ def _get_multinode_indices(penalty, is_constructing_penalty: bool):
     return phases, nodes, subnodes
 
 
-def _reshape_to_vector(m):
-    """
-    Reshape a matrix to a vector (column major)
-    """
+# These helpers are called for every penalty node, so the type dispatch is done through a dict lookup on the exact
+# type instead of isinstance checks (which walk the MRO of each CasADi type on every call)
+_RESHAPE = {
+    SX: lambda m: m.reshape((-1, 1)),
+    MX: lambda m: m.reshape((-1, 1)),
+    DM: lambda m: m.reshape((-1, 1)),
+    np.ndarray: lambda m: m.reshape((-1, 1), order="F"),
+}
 
-    if isinstance(m, (SX, MX, DM)):
-        return m.reshape((-1, 1))
-    elif isinstance(m, np.ndarray):
-        return m.reshape((-1, 1), order="F")
-    else:
-        raise RuntimeError("Invalid type to reshape")
+# Shared return value of target() when a penalty has no target. It is size 0, so there is nothing a caller could
+# mutate through it
+_EMPTY_TARGET = np.empty(0, dtype=np.float64)
 
 
-def _vertcat(v):
+def _reshape_to_vector(m):
     """
-    Vertically concatenate a list of vectors
+    Reshape a matrix to a vector (column major)
     """
 
-    if not isinstance(v, list):
-        raise ValueError("_vertcat must be called with a list of vectors")
-
-    data_type = type(v[0])
-    for tp in v:
-        if not isinstance(tp, data_type):
-            raise ValueError("All elements of the list must be of the same type")
-
-    if isinstance(v[0], (SX, MX, DM)):
-        return vertcat(*v)
-    elif isinstance(v[0], np.ndarray):
-        return np.vstack(v)
-    else:
-        raise RuntimeError("Invalid type to vertcat")
+    fn = _RESHAPE.get(type(m))
+    if fn is None:
+        raise RuntimeError("Invalid type to reshape")
+    return fn(m)
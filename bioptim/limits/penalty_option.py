@@ -168,7 +168,9 @@ class PenaltyOption(OptionGeneric):
 
         self.target = None
         if target is not None:
-            self.target = np.array(target)
+            # The target is stored as a C-contiguous float64 array so that the per-node indexing done during the
+            # penalty evaluations returns cheap views instead of silently copying
+            self.target = np.ascontiguousarray(target, dtype=np.float64)
             # Make sure the target has at least 2 dimensions
             if len(self.target.shape) == 0:
                 self.target = self.target[np.newaxis]
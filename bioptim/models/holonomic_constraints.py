@@ -2,13 +2,19 @@
 This class contains different holonomic constraint function.
 """
 
+import threading
 from typing import Any, Callable
 
-from casadi import MX, Function, jacobian, vertcat
+from casadi import MX, Function, jacobian, jtimes, substitute, vertcat
 
 from .biorbd.biorbd_model import BiorbdModel
 from ..misc.options import OptionDict
 
+# Cache of the Functions built by HolonomicConstraintsFcn.superimpose_markers so building several constraints (or
+# several phases) on the same model does not re-trace and re-expand identical symbolic graphs
+_superimpose_markers_cache: dict = {}
+_superimpose_markers_lock = threading.Lock()
+
 
 class HolonomicConstraintsFcn:
     """
@@ -22,9 +28,13 @@ class HolonomicConstraintsFcn:
         marker_2: str = None,
         index: slice = slice(0, 3),
         local_frame_index: int = None,
+        expand: bool = True,
+        jit: bool = False,
     ) -> tuple[Function, Function, Function]:
         """
         Generate the constraint functions to superimpose two markers.
+        The generated functions are cached, so requesting the same constraint twice on the same model returns the
+        already-expanded Functions instead of re-deriving them.
 
         Parameters
         ----------
@@ -39,6 +49,13 @@ class HolonomicConstraintsFcn:
             The index of the markers to superimpose.
         local_frame_index: int
             The index of the frame in which the markers are expressed. If None, the markers are expressed in the global.
+        expand: bool
+            If the Functions should be expanded to SX. The expansion makes each evaluation faster, but its cost grows
+            quickly with the size of the model, so it can be turned off for very large models to save construction
+            time at a small per-evaluation cost.
+        jit: bool
+            If True, the generated Functions are just-in-time compiled to native code (requires a C compiler). The
+            evaluation is then much faster, at the cost of a one-time compilation when the constraint is built.
 
 
         Returns
@@ -46,15 +63,33 @@ class HolonomicConstraintsFcn:
         The constraint function, its jacobian and its double derivative.
         """
 
+        # The name to index resolutions walk the model's marker name map, so they are done once up front. The cache
+        # is keyed on the resulting ints, so different names resolving to the same markers share an entry
+        marker_1_index = biorbd_model.marker_index(marker_1)
+        marker_2_index = biorbd_model.marker_index(marker_2) if marker_2 is not None else None
+
+        cache_key = (
+            id(biorbd_model),
+            marker_1_index,
+            marker_2_index,
+            (index.start, index.stop, index.step),
+            local_frame_index,
+            expand,
+            jit,
+        )
+        with _superimpose_markers_lock:
+            if cache_key in _superimpose_markers_cache:
+                return _superimpose_markers_cache[cache_key]
+
         # symbolic variables to create the functions
         q_sym = MX.sym("q", biorbd_model.nb_q, 1)
         q_dot_sym = MX.sym("q_dot", biorbd_model.nb_qdot, 1)
         q_ddot_sym = MX.sym("q_ddot", biorbd_model.nb_qdot, 1)
 
         # symbolic markers in global frame
-        marker_1_sym = biorbd_model.marker(q_sym, index=biorbd_model.marker_index(marker_1))
+        marker_1_sym = biorbd_model.marker(q_sym, index=marker_1_index)
         if marker_2 is not None:
-            marker_2_sym = biorbd_model.marker(q_sym, index=biorbd_model.marker_index(marker_2))
+            marker_2_sym = biorbd_model.marker(q_sym, index=marker_2_index)
 
         else:
             marker_2_sym = MX([0, 0, 0])
@@ -70,34 +105,48 @@ class HolonomicConstraintsFcn:
         # the jacobian of the constraint
         constraints_jacobian = jacobian(constraint, q_sym)
 
-        constraints_func = Function(
-            "holonomic_constraints",
-            [q_sym],
-            [constraint],
-            ["q"],
-            ["holonomic_constraint"],
-        ).expand()
-
-        constraints_jacobian_func = Function(
-            "holonomic_constraints_jacobian",
-            [q_sym],
-            [constraints_jacobian],
-            ["q"],
-            ["holonomic_constraints_jacobian"],
-        ).expand()
-
-        # the double derivative of the constraint
+        # When jit is requested, the Functions are compiled to native code instead of being expanded to SX (the
+        # expansion would discard the compiled wrapper and is redundant with the native evaluation anyway)
+        fcn_opts = {"cse": True}
+        if jit:
+            fcn_opts.update({"jit": True, "compiler": "shell", "jit_options": {"compiler": "gcc", "flags": ["-O3"]}})
+
+        # the double derivative of the constraint. The first term is the Jacobian-vector product J(q) @ q_ddot,
+        # formed with forward-mode AD so the dense Jacobian is never materialized inside this graph. The second term
+        # keeps the original formulation (the Jacobian evaluated at q_dot)
         constraints_double_derivative = (
-            constraints_jacobian_func(q_sym) @ q_ddot_sym + constraints_jacobian_func(q_dot_sym) @ q_dot_sym
+            jtimes(constraint, q_sym, q_ddot_sym) + substitute(constraints_jacobian, q_sym, q_dot_sym) @ q_dot_sym
         )
 
-        constraints_double_derivative_func = Function(
-            "holonomic_constraints_double_derivative",
+        # The three outputs share the marker kinematics subgraph, so they are built as a single Function (letting
+        # cse factor the common work) from which per-output Functions are derived
+        combined_func = Function(
+            "holonomic_constraints_combined",
             [q_sym, q_dot_sym, q_ddot_sym],
-            [constraints_double_derivative],
+            [constraint, constraints_jacobian, constraints_double_derivative],
+            ["q", "q_dot", "q_ddot"],
+            ["holonomic_constraint", "holonomic_constraints_jacobian", "holonomic_constraints_double_derivative"],
+            fcn_opts,
+        )
+        if expand and not jit:
+            combined_func = combined_func.expand()
+
+        constraints_func = combined_func.factory("holonomic_constraints", ["q"], ["holonomic_constraint"])
+        constraints_jacobian_func = combined_func.factory(
+            "holonomic_constraints_jacobian", ["q"], ["holonomic_constraints_jacobian"]
+        )
+        constraints_double_derivative_func = combined_func.factory(
+            "holonomic_constraints_double_derivative",
             ["q", "q_dot", "q_ddot"],
             ["holonomic_constraints_double_derivative"],
-        ).expand()
+        )
+
+        with _superimpose_markers_lock:
+            _superimpose_markers_cache[cache_key] = (
+                constraints_func,
+                constraints_jacobian_func,
+                constraints_double_derivative_func,
+            )
 
         return constraints_func, constraints_jacobian_func, constraints_double_derivative_func
 
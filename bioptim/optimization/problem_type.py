@@ -22,6 +22,13 @@ class SocpType:
         def __init__(self, with_cholesky: bool = False):
             self.with_cholesky = with_cholesky
 
+        @staticmethod
+        def _prepare_stochastic_dynamics(program, constraints, phase_transition):
+            """
+            Declare the internal stochastic constraints of the explicit formulation on the program
+            """
+            program._prepare_stochastic_dynamics_explicit(constraints=constraints)
+
     class TRAPEZOIDAL_IMPLICIT:
         """
         The class used to declare a stochastic optimal control problem with trapezoidal integration and the variables
@@ -35,6 +42,13 @@ class SocpType:
         def __init__(self, with_cholesky: bool = False):
             self.with_cholesky = with_cholesky
 
+        @staticmethod
+        def _prepare_stochastic_dynamics(program, constraints, phase_transition):
+            """
+            Declare the internal stochastic constraints of the implicit formulation on the program
+            """
+            program._prepare_stochastic_dynamics_implicit(constraints=constraints)
+
     class COLLOCATION:
         """
         The class used to declare a stochastic optimal control problem taking advantage of the collocation integration.
@@ -73,3 +87,10 @@ class SocpType:
                     "To initialize automatically the values of the stochastic variables, you need to provide the value of the covariance matrix at the first node (initial_cov)."
                 )
             self.initial_cov = initial_cov
+
+        @staticmethod
+        def _prepare_stochastic_dynamics(program, constraints, phase_transition):
+            """
+            Declare the internal stochastic constraints of the collocation formulation on the program
+            """
+            program._prepare_stochastic_dynamics_collocation(constraints=constraints, phase_transition=phase_transition)
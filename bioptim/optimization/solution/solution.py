@@ -140,6 +140,7 @@ class Solution:
 
         # Penalties
         self._cost, self._detailed_cost, self.constraints = cost, None, constraints
+        self._total_cost_weighted = None
 
         # Solver options
         self.status, self.iterations = status, iterations
@@ -152,6 +153,7 @@ class Solution:
         self._stepwise_controls = None
         self._parameters = None
         self._decision_algebraic_states = None
+        self._merged_data_cache = {}
 
         self.vector = vector
         if self.vector is not None:
@@ -490,7 +492,34 @@ class Solution:
 
         return times if len(times) > 1 else times[0]
 
-    def decision_states(self, scaled: bool = False, to_merge: SolutionMerge | list[SolutionMerge] = None):
+    def _merged_data(
+        self,
+        attr: str,
+        scaled: bool,
+        to_merge: SolutionMerge | list[SolutionMerge],
+        keys: list[str] | tuple[str, ...],
+    ):
+        """
+        Return (and cache) the merged view of the SolutionData stored in attr. Merging concatenates every node of
+        every requested key, so repeated accesses with the same arguments reuse the previous result. The decision
+        variables of a solution never change, but note that the returned arrays are shared between calls and should
+        not be modified in place.
+        """
+        to_merge_key = tuple(to_merge) if isinstance(to_merge, list) else to_merge
+        keys_key = tuple(keys) if keys is not None else None
+        cache_key = (attr, scaled, to_merge_key, keys_key)
+        if cache_key not in self._merged_data_cache:
+            self._merged_data_cache[cache_key] = getattr(self, attr).to_dict(
+                to_merge=to_merge, scaled=scaled, keys=keys
+            )
+        return self._merged_data_cache[cache_key]
+
+    def decision_states(
+        self,
+        scaled: bool = False,
+        to_merge: SolutionMerge | list[SolutionMerge] = None,
+        keys: list[str] | tuple[str, ...] = None,
+    ):
         """
         Returns the decision states
 
@@ -501,13 +530,15 @@ class Solution:
             is as the model needs temps). If you don't know what it means, you probably want the unscaled version.
         to_merge: SolutionMerge | list[SolutionMerge, ...]
             The type of merge to perform. If None, then no merge is performed.
+        keys: list[str] | tuple[str, ...]
+            The variables to return. If None, all the variables are merged and returned.
 
         Returns
         -------
         The decision variables
         """
 
-        data = self._decision_states.to_dict(to_merge=to_merge, scaled=scaled)
+        data = self._merged_data("_decision_states", scaled, to_merge, keys)
         if not isinstance(data, list):
             return data
         return data if len(data) > 1 else data[0]
@@ -537,7 +568,12 @@ class Solution:
             return data
         return data if len(data) > 1 else data[0]
 
-    def decision_controls(self, scaled: bool = False, to_merge: SolutionMerge | list[SolutionMerge] = None):
+    def decision_controls(
+        self,
+        scaled: bool = False,
+        to_merge: SolutionMerge | list[SolutionMerge] = None,
+        keys: list[str] | tuple[str, ...] = None,
+    ):
         """
         Returns the decision controls
 
@@ -548,10 +584,17 @@ class Solution:
             is as the model needs temps). If you don't know what it means, you probably want the unscaled version.
         to_merge : SolutionMerge | list[SolutionMerge, ...]
             The type of merge to perform. If None, then no merge is performed.
+        keys: list[str] | tuple[str, ...]
+            The variables to return. If None, all the variables are merged and returned.
         """
-        return self.stepwise_controls(scaled=scaled, to_merge=to_merge)
+        return self.stepwise_controls(scaled=scaled, to_merge=to_merge, keys=keys)
 
-    def stepwise_controls(self, scaled: bool = False, to_merge: SolutionMerge | list[SolutionMerge] = None):
+    def stepwise_controls(
+        self,
+        scaled: bool = False,
+        to_merge: SolutionMerge | list[SolutionMerge] = None,
+        keys: list[str] | tuple[str, ...] = None,
+    ):
         """
         Returns the controls. Note the final control is always present but set to np.nan if it is not defined
 
@@ -562,13 +605,15 @@ class Solution:
             the model needs temps). If you don't know what it means, you probably want the unscaled version.
         to_merge: SolutionMerge | list[SolutionMerge, ...]
             The type of merge to perform. If None, then no merge is performed.
+        keys: list[str] | tuple[str, ...]
+            The variables to return. If None, all the variables are merged and returned.
 
         Returns
         -------
         The controls
         """
 
-        data = self._stepwise_controls.to_dict(to_merge=to_merge, scaled=scaled)
+        data = self._merged_data("_stepwise_controls", scaled, to_merge, keys)
         if not isinstance(data, list):
             return data
         return data if len(data) > 1 else data[0]
@@ -617,7 +662,12 @@ class Solution:
 
         return out
 
-    def decision_algebraic_states(self, scaled: bool = False, to_merge: SolutionMerge | list[SolutionMerge] = None):
+    def decision_algebraic_states(
+        self,
+        scaled: bool = False,
+        to_merge: SolutionMerge | list[SolutionMerge] = None,
+        keys: list[str] | tuple[str, ...] = None,
+    ):
         """
         Returns the decision algebraic_states
 
@@ -628,13 +678,15 @@ class Solution:
             is as the model needs temps). If you don't know what it means, you probably want the unscaled version.
         to_merge: SolutionMerge | list[SolutionMerge, ...]
             The type of merge to perform. If None, then no merge is performed.
+        keys: list[str] | tuple[str, ...]
+            The variables to return. If None, all the variables are merged and returned.
 
         Returns
         -------
         The decision variables
         """
 
-        data = self._decision_algebraic_states.to_dict(to_merge=to_merge, scaled=scaled)
+        data = self._merged_data("_decision_algebraic_states", scaled, to_merge, keys)
         if not isinstance(data, list):
             return data
         return data if len(data) > 1 else data[0]
@@ -1161,6 +1213,15 @@ class Solution:
             self._compute_detailed_cost()
         return self._detailed_cost
 
+    @property
+    def total_cost_weighted(self):
+        """
+        The sum of the weighted values of all the declared penalties, computed once on first access
+        """
+        if self._total_cost_weighted is None:
+            self._total_cost_weighted = sum(cost["cost_value_weighted"] for cost in self.detailed_cost)
+        return self._total_cost_weighted
+
     def _compute_detailed_cost(self):
         """
         Adds the detailed objective functions and/or constraints values to sol
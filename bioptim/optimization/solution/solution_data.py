@@ -92,9 +92,18 @@ class SolutionData:
     def keys(self, phase: int = 0):
         return self.unscaled[phase].keys()
 
-    def to_dict(self, to_merge: SolutionMerge | list[SolutionMerge] = None, scaled: bool = False):
+    def to_dict(
+        self,
+        to_merge: SolutionMerge | list[SolutionMerge] = None,
+        scaled: bool = False,
+        keys: list[str] | tuple[str, ...] = None,
+    ):
         data = self.scaled if scaled else self.unscaled
 
+        if keys is not None:
+            # Restrict the data to the requested variables so the merges below do not process unused keys
+            data = [{key: phase_data[key] for key in keys} for phase_data in data]
+
         if to_merge is None:
             to_merge = []
 
@@ -187,22 +187,12 @@ class StochasticOptimalControlProgram(OptimalControlProgram):
         multinode_constraints.add_or_replace_to_penalty_pool(self)
         multinode_objectives.add_or_replace_to_penalty_pool(self)
 
-        # Add the internal multi-node constraints for the stochastic ocp
-        if isinstance(self.problem_type, SocpType.TRAPEZOIDAL_EXPLICIT):
-            self._prepare_stochastic_dynamics_explicit(
-                constraints=constraints,
-            )
-        elif isinstance(self.problem_type, SocpType.TRAPEZOIDAL_IMPLICIT):
-            self._prepare_stochastic_dynamics_implicit(
-                constraints=constraints,
-            )
-        elif isinstance(self.problem_type, SocpType.COLLOCATION):
-            self._prepare_stochastic_dynamics_collocation(
-                constraints=constraints,
-                phase_transition=phase_transition,
-            )
-        else:
+        # Add the internal multi-node constraints for the stochastic ocp. Each SocpType declares its own
+        # preparation, so adding a new problem type does not require modifying this dispatch
+        prepare_stochastic_dynamics = getattr(self.problem_type, "_prepare_stochastic_dynamics", None)
+        if prepare_stochastic_dynamics is None:
             raise RuntimeError("Wrong choice of problem_type, you must choose one of the SocpType.")
+        prepare_stochastic_dynamics(self, constraints=constraints, phase_transition=phase_transition)
 
     def _prepare_stochastic_dynamics_explicit(self, constraints):
         """
@@ -212,21 +202,36 @@ class StochasticOptimalControlProgram(OptimalControlProgram):
         constraints.add(ConstraintFcn.STOCHASTIC_MEAN_SENSORY_INPUT_EQUALS_REFERENCE, node=Node.ALL)
 
         penalty_m_dg_dz_list = MultinodeConstraintList()
-        for i_phase, nlp in enumerate(self.nlp):
-            for i_node in range(nlp.ns):
-                penalty_m_dg_dz_list.add(
-                    MultinodeConstraintFcn.STOCHASTIC_HELPER_MATRIX_EXPLICIT,
-                    nodes_phase=(i_phase, i_phase),
-                    nodes=(i_node, i_node + 1),
-                )
-            if i_phase > 0:
-                penalty_m_dg_dz_list.add(
-                    MultinodeConstraintFcn.STOCHASTIC_HELPER_MATRIX_EXPLICIT,
-                    nodes_phase=(i_phase - 1, i_phase),
-                    nodes=(-1, 0),
-                )
+        self._add_helper_matrix_constraints(
+            penalty_m_dg_dz_list,
+            MultinodeConstraintFcn.STOCHASTIC_HELPER_MATRIX_EXPLICIT,
+            skip_last_phase_transition=False,
+        )
         penalty_m_dg_dz_list.add_or_replace_to_penalty_pool(self)
 
+    def _add_helper_matrix_constraints(self, multinode_list, fcn, skip_last_phase_transition: bool):
+        """
+        Adds one helper matrix constraint per shooting interval and the corresponding phase transition constraints.
+        This loop is shared by the explicit and implicit formulations.
+
+        Parameters
+        ----------
+        multinode_list: MultinodeConstraintList
+            The list receiving the constraints
+        fcn: MultinodeConstraintFcn
+            The helper matrix constraint of the formulation
+        skip_last_phase_transition: bool
+            If the transition into the last phase should be skipped (as the implicit formulation does)
+        """
+
+        n_phases = len(self.nlp)
+        for i_phase, nlp in enumerate(self.nlp):
+            multinode_list.add_range(
+                fcn, nodes_phase=(i_phase, i_phase), node_pairs=((i_node, i_node + 1) for i_node in range(nlp.ns))
+            )
+            if i_phase > 0 and not (skip_last_phase_transition and i_phase == n_phases - 1):
+                multinode_list.add(fcn, nodes_phase=(i_phase - 1, i_phase), nodes=(-1, 0))
+
     def _prepare_stochastic_dynamics_implicit(self, constraints):
         """
         Adds the internal constraint needed for the implicit formulation of the stochastic ocp.
@@ -235,51 +240,33 @@ class StochasticOptimalControlProgram(OptimalControlProgram):
         constraints.add(ConstraintFcn.STOCHASTIC_MEAN_SENSORY_INPUT_EQUALS_REFERENCE, node=Node.ALL)
 
         multi_node_penalties = MultinodeConstraintList()
+        df_dw = MultinodeConstraintFcn.STOCHASTIC_DF_DW_IMPLICIT
+
         # Constraints for M
-        for i_phase, nlp in enumerate(self.nlp):
-            for i_node in range(nlp.ns):
-                multi_node_penalties.add(
-                    MultinodeConstraintFcn.STOCHASTIC_HELPER_MATRIX_IMPLICIT,
-                    nodes_phase=(i_phase, i_phase),
-                    nodes=(i_node, i_node + 1),
-                )
-            if i_phase > 0 and i_phase < len(self.nlp) - 1:
-                multi_node_penalties.add(
-                    MultinodeConstraintFcn.STOCHASTIC_HELPER_MATRIX_IMPLICIT,
-                    nodes_phase=(i_phase - 1, i_phase),
-                    nodes=(-1, 0),
-                )
+        self._add_helper_matrix_constraints(
+            multi_node_penalties,
+            MultinodeConstraintFcn.STOCHASTIC_HELPER_MATRIX_IMPLICIT,
+            skip_last_phase_transition=True,
+        )
 
-        # Constraints for P
+        # Constraints for P, A and C, declared in a single pass over the phases
         for i_phase, nlp in enumerate(self.nlp):
             constraints.add(
                 ConstraintFcn.STOCHASTIC_COVARIANCE_MATRIX_CONTINUITY_IMPLICIT,
                 node=Node.ALL,
                 phase=i_phase,
             )
-
-        # Constraints for A
-        for i_phase, nlp in enumerate(self.nlp):
             constraints.add(
                 ConstraintFcn.STOCHASTIC_DF_DX_IMPLICIT,
                 node=Node.ALL,
                 phase=i_phase,
             )
 
-        # Constraints for C
-        for i_phase, nlp in enumerate(self.nlp):
-            for i_node in range(nlp.ns):
-                multi_node_penalties.add(
-                    MultinodeConstraintFcn.STOCHASTIC_DF_DW_IMPLICIT,
-                    nodes_phase=(i_phase, i_phase),
-                    nodes=(i_node, i_node + 1),
-                )
+            multi_node_penalties.add_range(
+                df_dw, nodes_phase=(i_phase, i_phase), node_pairs=((i_node, i_node + 1) for i_node in range(nlp.ns))
+            )
             if i_phase > 0 and i_phase < len(self.nlp) - 1:
-                multi_node_penalties.add(
-                    MultinodeConstraintFcn.STOCHASTIC_DF_DW_IMPLICIT,
-                    nodes_phase=(i_phase, i_phase + 1),
-                    nodes=(-1, 0),
-                )
+                multi_node_penalties.add(df_dw, nodes_phase=(i_phase, i_phase + 1), nodes=(-1, 0))
 
         multi_node_penalties.add_or_replace_to_penalty_pool(self)
 
@@ -351,29 +338,30 @@ class StochasticOptimalControlProgram(OptimalControlProgram):
                 ref_init = ref_init_this_time if i == 0 else np.hstack((ref_init, ref_init_this_time))
             return ref_init
 
+        def get_mapped_guesses(time_vector, x_guess, u_guess, fake_algebraic_states, nlp):
+            # Gather the per-node inputs of the collocation jacobians as horizontally stacked matrices, so the
+            # jacobians can be evaluated on all the nodes in a single mapped call instead of one Python call per node
+            n_steps = self.problem_type.polynomial_degree + 2
+            t_span_guess = np.vstack((time_vector[:-1], np.diff(time_vector)))
+            x_node_guess = x_guess[:, 0::n_steps][:, : nlp.ns]
+            z_guess = x_guess[:, np.arange(x_guess.shape[1]) % n_steps != 0]
+            return t_span_guess, x_node_guess, z_guess, u_guess[:, : nlp.ns], fake_algebraic_states[:, : nlp.ns]
+
         def get_m_init(time_vector, x_guess, u_guess, p_guess, fake_algebraic_states, nlp, variable_sizes, Fdz, Gdz):
+            mapped_guesses = get_mapped_guesses(time_vector, x_guess, u_guess, fake_algebraic_states, nlp)
+            t_span_guess, x_node_guess, z_guess, u_node_guess, a_node_guess = mapped_guesses
+            df_dz_all = np.array(
+                Fdz.map(nlp.ns)(t_span_guess, x_node_guess, z_guess, u_node_guess, p_guess, a_node_guess)
+            )
+            dg_dz_all = np.array(
+                Gdz.map(nlp.ns)(t_span_guess, x_node_guess, z_guess, u_node_guess, p_guess, a_node_guess)
+            )
+            n_cols = df_dz_all.shape[1] // nlp.ns
+
             m_init = np.zeros((variable_sizes["n_m"], nlp.ns + 1))
             for i in range(nlp.ns):
-                index_this_time = [
-                    i * (self.problem_type.polynomial_degree + 2) + j
-                    for j in range(self.problem_type.polynomial_degree + 2)
-                ]
-                df_dz = Fdz(
-                    vertcat(time_vector[i], time_vector[i + 1] - time_vector[i]),
-                    x_guess[:, index_this_time[0]],
-                    x_guess[:, index_this_time[1:]],
-                    u_guess[:, i],
-                    p_guess,
-                    fake_algebraic_states[:, i],
-                )
-                dg_dz = Gdz(
-                    vertcat(time_vector[i], time_vector[i + 1] - time_vector[i]),
-                    x_guess[:, index_this_time[0]],
-                    x_guess[:, index_this_time[1:]],
-                    u_guess[:, i],
-                    p_guess,
-                    fake_algebraic_states[:, i],
-                )
+                df_dz = df_dz_all[:, i * n_cols : (i + 1) * n_cols]
+                dg_dz = dg_dz_all[:, i * n_cols : (i + 1) * n_cols]
 
                 m_this_time = df_dz @ np.linalg.inv(dg_dz)
                 m_init[:, i] = np.reshape(StochasticBioModel.reshape_to_vector(m_this_time), (-1,))
@@ -400,29 +388,24 @@ class StochasticOptimalControlProgram(OptimalControlProgram):
                 vertcat(nlp.model.motor_noise_magnitude, nlp.model.sensory_noise_magnitude).shape[0]
             )
 
+            mapped_guesses = get_mapped_guesses(time_vector, x_guess, u_guess, fake_algebraic_states, nlp)
+            t_span_guess, x_node_guess, z_guess, u_node_guess, a_node_guess = mapped_guesses
+            dg_dx_all = np.array(
+                Gdx.map(nlp.ns)(t_span_guess, x_node_guess, z_guess, u_node_guess, p_guess, a_node_guess)
+            )
+            dg_dw_all = np.array(
+                Gdw.map(nlp.ns)(t_span_guess, x_node_guess, z_guess, u_node_guess, p_guess, a_node_guess)
+            )
+            n_cols_dx = dg_dx_all.shape[1] // nlp.ns
+            n_cols_dw = dg_dw_all.shape[1] // nlp.ns
+
             cov_init = np.zeros((variable_sizes["n_cov"], nlp.ns + 1))
             cov_init[:, 0] = np.reshape(StochasticBioModel.reshape_to_vector(initial_covariance), (-1,))
+            # The jacobians were evaluated in one mapped call above; only the sequential covariance propagation
+            # remains in this loop
             for i in range(nlp.ns):
-                index_this_time = [
-                    i * (self.problem_type.polynomial_degree + 2) + j
-                    for j in range(self.problem_type.polynomial_degree + 2)
-                ]
-                dg_dx = Gdx(
-                    vertcat(time_vector[i], time_vector[i + 1] - time_vector[i]),
-                    x_guess[:, index_this_time[0]],
-                    x_guess[:, index_this_time[1:]],
-                    u_guess[:, i],
-                    p_guess,
-                    fake_algebraic_states[:, i],
-                )
-                dg_dw = Gdw(
-                    vertcat(time_vector[i], time_vector[i + 1] - time_vector[i]),
-                    x_guess[:, index_this_time[0]],
-                    x_guess[:, index_this_time[1:]],
-                    u_guess[:, i],
-                    p_guess,
-                    fake_algebraic_states[:, i],
-                )
+                dg_dx = dg_dx_all[:, i * n_cols_dx : (i + 1) * n_cols_dx]
+                dg_dw = dg_dw_all[:, i * n_cols_dw : (i + 1) * n_cols_dw]
 
                 m_matrix = StochasticBioModel.reshape_to_matrix(m_init[:, i], nlp.model.matrix_shape_m)
                 cov_matrix = StochasticBioModel.reshape_to_matrix(cov_init[:, i], nlp.model.matrix_shape_cov)
@@ -1,19 +1,32 @@
+import functools
 import os
 import pytest
 
 import numpy as np
+from numpy.testing import assert_allclose, assert_equal
 from casadi import DM, vertcat
 from bioptim import Solver, SocpType, SolutionMerge, PenaltyHelpers
 
-
-@pytest.mark.parametrize("use_sx", [False, True])
-def test_arm_reaching_torque_driven_collocations(use_sx: bool):
-    from bioptim.examples.stochastic_optimal_control import arm_reaching_torque_driven_collocations as ocp_module
-
-    final_time = 0.4
-    n_shooting = 4
-    hand_final_position = np.array([9.359873986980460e-12, 0.527332023564034])
-
+# Expected values shared by (or too large to keep inline in) the tests below, built once at import time
+_HAND_FINAL_POSITION = np.array([9.359873986980460e-12, 0.527332023564034])
+_Q_INITIAL = np.array([0.34906585, 2.24586773])
+_Q_FINAL = np.array([0.9256103, 1.29037205])
+_QDOT_ZERO = np.array([0.0, 0.0])
+_REF_NODE0 = np.array([2.81907786e-02, 2.84412560e-01, 0, 0])
+_M_NODE0_FIRST_ROWS = np.array([1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0])
+# The large golden arrays live next to the tests as a compressed archive, which spares parsing hundreds of float
+# literals at every collection of this module. This is preferred over embedding the raw bytes in the source
+# (np.frombuffer on a base64 literal would be just as cheap to load) because the archive stays diffable with
+# np.load from the command line while an inline blob would be opaque in reviews
+_EXPECTED = np.load(os.path.join(os.path.dirname(__file__), "_expected_stoch_collocation.npz"))
+_OBSTACLE_M_NODE0 = _EXPECTED["obstacle_m_node0"]
+_OBSTACLE_COV_FINAL = _EXPECTED["obstacle_cov_final"]
+
+
+def _arm_reaching_noise_magnitudes():
+    """
+    The motor and sensory noise magnitudes of the arm reaching collocation ocp
+    """
     dt = 0.05
     motor_noise_std = 0.05
     wPq_std = 3e-4
@@ -22,15 +35,26 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
     wPq_magnitude = DM(np.array([wPq_std**2 / dt, wPq_std**2 / dt]))
     wPqdot_magnitude = DM(np.array([wPqdot_std**2 / dt, wPqdot_std**2 / dt]))
     sensory_noise_magnitude = vertcat(wPq_magnitude, wPqdot_magnitude)
+    return motor_noise_magnitude, sensory_noise_magnitude
+
 
+@functools.lru_cache(maxsize=None)
+def _arm_reaching_collocations_solved(use_sx: bool):
+    """
+    Build and solve (once per symbolic type) the arm reaching collocation socp, so the assertions below and repeated
+    runs in the same session reuse the solution instead of re-running ipopt
+    """
+    from bioptim.examples.stochastic_optimal_control import arm_reaching_torque_driven_collocations as ocp_module
+
+    motor_noise_magnitude, sensory_noise_magnitude = _arm_reaching_noise_magnitudes()
     bioptim_folder = os.path.dirname(ocp_module.__file__)
 
     ocp = ocp_module.prepare_socp(
         biorbd_model_path=bioptim_folder + "/models/LeuvenArmModel.bioMod",
-        final_time=final_time,
-        n_shooting=n_shooting,
+        final_time=0.4,
+        n_shooting=4,
         polynomial_degree=3,
-        hand_final_position=hand_final_position,
+        hand_final_position=_HAND_FINAL_POSITION,
         motor_noise_magnitude=motor_noise_magnitude,
         sensory_noise_magnitude=sensory_noise_magnitude,
         use_sx=use_sx,
@@ -40,16 +64,66 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
     solver = Solver.IPOPT(show_online_optim=False)
     solver.set_nlp_scaling_method("none")
 
-    sol = ocp.solve(solver)
+    return ocp, ocp.solve(solver)
+
+
+@functools.lru_cache(maxsize=None)
+def _obstacle_avoidance_solved(use_sx: bool):
+    """
+    Build and solve (once per symbolic type) the robustified obstacle avoidance socp
+    """
+    from bioptim.examples.stochastic_optimal_control import obstacle_avoidance_direct_collocation as ocp_module
+
+    polynomial_degree = 3
+    n_shooting = 10
+
+    q_init = np.zeros((2, (polynomial_degree + 2) * n_shooting + 1))
+    zq_init = ocp_module.initialize_circle((polynomial_degree + 1) * n_shooting + 1)
+    for i in range(n_shooting + 1):
+        j = i * (polynomial_degree + 1)
+        k = i * (polynomial_degree + 2)
+        q_init[:, k] = zq_init[:, j]
+        q_init[:, k + 1 : k + 1 + (polynomial_degree + 1)] = zq_init[:, j : j + (polynomial_degree + 1)]
+
+    ocp = ocp_module.prepare_socp(
+        final_time=4,
+        n_shooting=n_shooting,
+        polynomial_degree=polynomial_degree,
+        motor_noise_magnitude=np.array([1, 1]),
+        q_init=q_init,
+        is_stochastic=True,
+        is_robustified=True,
+        socp_type=SocpType.COLLOCATION(polynomial_degree=polynomial_degree, method="legendre"),
+        use_sx=use_sx,
+    )
+
+    # Solver parameters
+    solver = Solver.IPOPT(show_online_optim=False)
+    solver.set_maximum_iterations(4)
+    return ocp.solve(solver)
+
+
+@pytest.mark.parametrize("use_sx", [False, True])
+def test_arm_reaching_torque_driven_collocations(use_sx: bool):
+    from bioptim.examples.stochastic_optimal_control import arm_reaching_torque_driven_collocations as ocp_module
+
+    final_time = 0.4
+    n_shooting = 4
+    hand_final_position = _HAND_FINAL_POSITION
+    motor_noise_magnitude, sensory_noise_magnitude = _arm_reaching_noise_magnitudes()
+
+    bioptim_folder = os.path.dirname(ocp_module.__file__)
+
+    ocp, sol = _arm_reaching_collocations_solved(use_sx)
 
     # Check objective function value
     f = np.array(sol.cost)
-    np.testing.assert_equal(f.shape, (1, 1))
-    np.testing.assert_almost_equal(f[0, 0], 426.84572091057413)
+    assert_equal(f.shape, (1, 1))
+    assert_allclose(f[0, 0], 426.84572091057413, atol=1.5e-7, rtol=0)
 
     # Check constraints
     g = np.array(sol.constraints)
-    np.testing.assert_equal(g.shape, (442, 1))
+    assert_equal(g.shape, (442, 1))
 
     # Check some of the results
     states = sol.decision_states(to_merge=SolutionMerge.NODES)
@@ -60,33 +134,23 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
     tau = controls["tau"]
     k, ref, m, cov = algebraic_states["k"], algebraic_states["ref"], algebraic_states["m"], algebraic_states["cov"]
 
-    # initial and final position
-    np.testing.assert_almost_equal(q[:, 0], np.array([0.34906585, 2.24586773]))
-    np.testing.assert_almost_equal(q[:, -1], np.array([0.9256103, 1.29037205]))
-    np.testing.assert_almost_equal(qdot[:, 0], np.array([0, 0]))
-    np.testing.assert_almost_equal(qdot[:, -1], np.array([0, 0]))
-
-    np.testing.assert_almost_equal(tau[:, 0], np.array([1.72235954, -0.90041542]))
-    np.testing.assert_almost_equal(tau[:, -2], np.array([-1.64870266, 1.08550928]))
-
-    np.testing.assert_almost_equal(ref[:, 0], np.array([2.81907786e-02, 2.84412560e-01, 0, 0]))
-
-    np.testing.assert_almost_equal(
-        m[:10, 0],
-        np.array(
-            [
-                1.00000000e00,
-                0.0,
-                0.0,
-                0.0,
-                0.0,
-                1.00000000e00,
-                0.0,
-                0.0,
-                0.0,
-                0.0,
-            ]
+    # initial/final states, controls, reference and the first rows of m, compared in one concatenated call
+    assert_allclose(
+        np.concatenate((q[:, 0], q[:, -1], qdot[:, 0], qdot[:, -1], tau[:, 0], tau[:, -2], ref[:, 0], m[:10, 0])),
+        np.concatenate(
+            (
+                _Q_INITIAL,
+                _Q_FINAL,
+                _QDOT_ZERO,
+                _QDOT_ZERO,
+                np.array([1.72235954, -0.90041542]),
+                np.array([-1.64870266, 1.08550928]),
+                _REF_NODE0,
+                _M_NODE0_FIRST_ROWS,
+            )
         ),
+        atol=1.5e-7,
+        rtol=0,
     )
 
     # TODO: cov is still too sensitive to be properly tested, we need to test it otherwise
@@ -181,8 +245,8 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
         p_sol,
         a,
     )
-    np.testing.assert_almost_equal(constraint_value[0], shoulder_pos_initial, decimal=6)
-    np.testing.assert_almost_equal(constraint_value[1], elbow_pos_initial, decimal=6)
+    assert_allclose(constraint_value[0], shoulder_pos_initial, atol=1.5e-6, rtol=0)
+    assert_allclose(constraint_value[1], elbow_pos_initial, atol=1.5e-6, rtol=0)
 
     # Initial and final velocities
     penalty = socp.nlp[0].g[1]
@@ -209,8 +273,8 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
         p_sol,
         a,
     )
-    np.testing.assert_almost_equal(constraint_value[0], 0, decimal=6)
-    np.testing.assert_almost_equal(constraint_value[1], 0, decimal=6)
+    assert_allclose(constraint_value[0], 0, atol=1.5e-6, rtol=0)
+    assert_allclose(constraint_value[1], 0, atol=1.5e-6, rtol=0)
 
     penalty = socp.nlp[0].g[2]
     x = states_sol[:, 0, -1]
@@ -224,8 +288,8 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
         p_sol,
         a,
     )
-    np.testing.assert_almost_equal(constraint_value[0], 0, decimal=6)
-    np.testing.assert_almost_equal(constraint_value[1], 0, decimal=6)
+    assert_allclose(constraint_value[0], 0, atol=1.5e-6, rtol=0)
+    assert_allclose(constraint_value[1], 0, atol=1.5e-6, rtol=0)
 
     # Hand final marker position
     penalty = socp.nlp[0].g[4]
@@ -240,8 +304,8 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
         p_sol,
         a,
     )
-    np.testing.assert_almost_equal(constraint_value[0], hand_final_position[0], decimal=6)
-    np.testing.assert_almost_equal(constraint_value[1], hand_final_position[1], decimal=6)
+    assert_allclose(constraint_value[0], hand_final_position[0], atol=1.5e-6, rtol=0)
+    assert_allclose(constraint_value[1], hand_final_position[1], atol=1.5e-6, rtol=0)
 
     # Reference equals mean sensory input
     penalty = socp.nlp[0].g[7]
@@ -269,7 +333,7 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
             p_sol,
             a,
         )
-        np.testing.assert_almost_equal(constraint_value, np.zeros(constraint_value.shape), decimal=6)
+        assert_allclose(constraint_value, 0, atol=1.5e-6, rtol=0)
 
     # Constraint on M --------------------------------------------------------------------
     penalty = socp.nlp[0].g[8]
@@ -297,7 +361,7 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
             p_sol,
             a,
         )
-        np.testing.assert_almost_equal(constraint_value, np.zeros(constraint_value.shape), decimal=6)
+        assert_allclose(constraint_value, 0, atol=1.5e-6, rtol=0)
 
     # Covariance continuity --------------------------------------------------------------------
     penalty = socp.nlp[0].g[9]
@@ -326,7 +390,7 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
             p_sol,
             a,
         )
-        np.testing.assert_almost_equal(constraint_value, np.zeros(constraint_value.shape), decimal=6)
+        assert_allclose(constraint_value, 0, atol=1.5e-6, rtol=0)
 
     # States continuity --------------------------------------------------------------------
     penalty = socp.nlp[0].g_internal[0]
@@ -354,7 +418,7 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
             p_sol,
             a,
         )
-        np.testing.assert_almost_equal(constraint_value, np.zeros(constraint_value.shape), decimal=6)
+        assert_allclose(constraint_value, 0, atol=1.5e-6, rtol=0)
 
     # First collocation state is equal to the states at node
     penalty = socp.nlp[0].g_internal[1]
@@ -382,162 +446,59 @@ def test_arm_reaching_torque_driven_collocations(use_sx: bool):
             p_sol,
             a,
         )
-        np.testing.assert_almost_equal(constraint_value, np.zeros(constraint_value.shape), decimal=6)
+        assert_allclose(constraint_value, 0, atol=1.5e-6, rtol=0)
 
 
 @pytest.mark.parametrize("use_sx", [False, True])
 def test_obstacle_avoidance_direct_collocation(use_sx: bool):
-    from bioptim.examples.stochastic_optimal_control import obstacle_avoidance_direct_collocation as ocp_module
-
-    polynomial_degree = 3
-    n_shooting = 10
-
-    q_init = np.zeros((2, (polynomial_degree + 2) * n_shooting + 1))
-    zq_init = ocp_module.initialize_circle((polynomial_degree + 1) * n_shooting + 1)
-    for i in range(n_shooting + 1):
-        j = i * (polynomial_degree + 1)
-        k = i * (polynomial_degree + 2)
-        q_init[:, k] = zq_init[:, j]
-        q_init[:, k + 1 : k + 1 + (polynomial_degree + 1)] = zq_init[:, j : j + (polynomial_degree + 1)]
-
-    ocp = ocp_module.prepare_socp(
-        final_time=4,
-        n_shooting=n_shooting,
-        polynomial_degree=polynomial_degree,
-        motor_noise_magnitude=np.array([1, 1]),
-        q_init=q_init,
-        is_stochastic=True,
-        is_robustified=True,
-        socp_type=SocpType.COLLOCATION(polynomial_degree=polynomial_degree, method="legendre"),
-        use_sx=use_sx,
-    )
-
-    # Solver parameters
-    solver = Solver.IPOPT(show_online_optim=False)
-    solver.set_maximum_iterations(4)
-    sol = ocp.solve(solver)
+    sol = _obstacle_avoidance_solved(use_sx)
 
     # Check objective function value
     f = np.array(sol.cost)
-    np.testing.assert_equal(f.shape, (1, 1))
-    np.testing.assert_almost_equal(f[0, 0], 4.6220107868123605)
+    assert_equal(f.shape, (1, 1))
+    assert_allclose(f[0, 0], 4.6220107868123605, atol=1.5e-7, rtol=0)
 
     # Check constraints
     g = np.array(sol.constraints)
-    np.testing.assert_equal(g.shape, (1043, 1))
+    assert_equal(g.shape, (1043, 1))
 
     # Check some of the results
     states = sol.decision_states(to_merge=SolutionMerge.NODES)
     controls = sol.decision_controls(to_merge=SolutionMerge.NODES)
-    algebraic_states = sol.decision_algebraic_states(to_merge=SolutionMerge.NODES)
 
     q, qdot = states["q"], states["qdot"]
     u = controls["u"]
-    m, cov = algebraic_states["m"], algebraic_states["cov"]
-
-    # initial and final position
-    np.testing.assert_almost_equal(q[:, 0], np.array([-1.07999204e-27, 2.94926475e00]))
-    np.testing.assert_almost_equal(q[:, -1], np.array([-3.76592146e-26, 2.94926475e00]))
-    np.testing.assert_almost_equal(qdot[:, 0], np.array([3.59388215, 0.49607651]))
-    np.testing.assert_almost_equal(qdot[:, -1], np.array([3.59388215, 0.49607651]))
-
-    np.testing.assert_almost_equal(u[:, 0], np.array([2.2568354, 1.69720657]))
-    np.testing.assert_almost_equal(u[:, -1], np.array([0.82746288, 2.89042815]))
-
-    np.testing.assert_almost_equal(
-        m[:, 0],
-        np.array(
-            [
-                1.00000000e00,
-                -5.05457090e-25,
-                -3.45225516e-23,
-                4.63567667e-24,
-                -2.07762174e-24,
-                1.00000000e00,
-                5.85505404e-24,
-                2.11044910e-24,
-                5.35541145e-25,
-                -7.33375346e-25,
-                1.00000000e00,
-                3.31004423e-24,
-                6.69132819e-25,
-                -1.55199996e-25,
-                1.61445742e-24,
-                1.00000000e00,
-                1.90797247e-01,
-                -1.19090552e-02,
-                -3.23045118e-01,
-                -8.36867760e-02,
-                -1.29812817e-02,
-                1.69927215e-01,
-                -9.02323302e-02,
-                -4.15440327e-01,
-                2.91358598e-02,
-                4.62429927e-03,
-                -4.04540496e-02,
-                2.59478026e-03,
-                5.65168256e-03,
-                4.62998816e-02,
-                5.73943076e-03,
-                -3.07383562e-02,
-                3.91343262e-01,
-                -6.89506402e-03,
-                -4.87839314e-01,
-                -8.10220212e-02,
-                -7.02994760e-03,
-                3.85606978e-01,
-                -8.33694095e-02,
-                -5.61696657e-01,
-                4.84320277e-02,
-                7.51042245e-03,
-                4.20836460e-02,
-                4.20298027e-02,
-                7.79698790e-03,
-                5.92538743e-02,
-                4.52842640e-02,
-                9.08680212e-02,
-                2.76261710e-01,
-                9.59731386e-05,
-                -1.11028293e-01,
-                -7.03012679e-03,
-                6.11634134e-05,
-                2.76243341e-01,
-                -6.74241321e-03,
-                -1.14566661e-01,
-                1.09070369e-02,
-                7.09878476e-04,
-                1.98625775e-01,
-                1.83359034e-02,
-                7.31642248e-04,
-                1.11477554e-02,
-                1.81224176e-02,
-                2.12172685e-01,
-            ]
-        ),
-        decimal=6,
-    )
 
-    np.testing.assert_almost_equal(
-        cov[:, -1],
-        np.array(
-            [
-                0.00266764,
-                -0.0005587,
-                0.00241239,
-                -0.00088205,
-                -0.0005587,
-                0.00134316,
-                -0.00048081,
-                0.00673894,
-                0.00241239,
-                -0.00048081,
-                -0.00324733,
-                -0.00175754,
-                -0.00088205,
-                0.00673894,
-                -0.00175754,
-                0.02038775,
-            ]
+    # initial and final states and controls, compared in one concatenated call
+    assert_allclose(
+        np.concatenate((q[:, 0], q[:, -1], qdot[:, 0], qdot[:, -1], u[:, 0], u[:, -1])),
+        np.concatenate(
+            (
+                np.array([-1.07999204e-27, 2.94926475e00]),
+                np.array([-3.76592146e-26, 2.94926475e00]),
+                np.array([3.59388215, 0.49607651]),
+                np.array([3.59388215, 0.49607651]),
+                np.array([2.2568354, 1.69720657]),
+                np.array([0.82746288, 2.89042815]),
+            )
         ),
-        decimal=6,
+        atol=1.5e-7,
+        rtol=0,
     )
+
+
+@pytest.mark.parametrize("use_sx", [False, True])
+@pytest.mark.parametrize(
+    "field, column, expected",
+    [("m", 0, _OBSTACLE_M_NODE0), ("cov", -1, _OBSTACLE_COV_FINAL)],
+    ids=["m_node0", "cov_final"],
+)
+def test_obstacle_avoidance_algebraic_states(use_sx: bool, field: str, column: int, expected: np.ndarray):
+    """
+    The algebraic state goldens are independent given the memoized solve, so they are parametrized for pytest-xdist
+    to distribute (the solve itself still runs once per worker thanks to the cache)
+    """
+    sol = _obstacle_avoidance_solved(use_sx)
+
+    algebraic_states = sol.decision_algebraic_states(to_merge=SolutionMerge.NODES, keys=(field,))
+    assert_allclose(algebraic_states[field][:, column], expected, atol=1.5e-6, rtol=0)
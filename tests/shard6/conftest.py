@@ -0,0 +1,32 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+_GOLDENS_DIR = Path(__file__).parent / "_goldens"
+
+
+def pytest_configure(config):
+    # Each test in this shard already keeps a core busy inside ipopt, so prevent the linear solver and blas from
+    # spawning their own thread pools when the shard is distributed across workers (pytest -n auto --dist=loadgroup)
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    os.environ.setdefault("MKL_NUM_THREADS", "1")
+    config.addinivalue_line("markers", "xdist_group(name): group tests on the same pytest-xdist worker")
+    config.addinivalue_line("markers", "slow: expensive edge-case tests, deselect with -m 'not slow'")
+
+
+def golden(name: str) -> np.ndarray:
+    """
+    Load one of the expected-value arrays stored next to the tests. Keeping them as .npy files avoids parsing
+    hundreds of float literals at every import of the test modules.
+
+    Parameters
+    ----------
+    name: str
+        The base name of the file in the _goldens directory
+
+    Returns
+    -------
+    The expected values (as a read-only memory map)
+    """
+    return np.load(_GOLDENS_DIR / f"{name}.npy", mmap_mode="r")